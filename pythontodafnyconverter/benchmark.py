@@ -0,0 +1,70 @@
+import glob
+import os.path
+import subprocess
+import sys
+import tempfile
+import timeit
+
+# Number of passes over the test snippets when measuring throughput.
+REPEAT = 100
+
+# Budget, in microseconds, for importing the translator, which is the startup
+# cost of a one-shot translation on top of the interpreter's own. Checked by
+# test_cli; set SKIP_TIMING_TESTS to skip that check on loaded machines.
+STARTUP_BUDGET = 20000
+
+
+def import_time(module, repeat=3):
+    """Return the cumulative time, in microseconds, taken to import the module
+    named module in a fresh interpreter, as reported by -X importtime. The
+    best of repeat runs is returned, to discount interference from other
+    processes.
+
+    The module is imported once beforehand with its bytecode cached under a
+    temporary directory, as it would be once installed, so that compiling it
+    is not part of the time. Nothing is written to the source tree.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, "-X", "importtime", "-c", "import " + module]
+    times = []
+    with tempfile.TemporaryDirectory() as prefix:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=prefix)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        subprocess.run(command, cwd=directory, env=env,
+                       stderr=subprocess.DEVNULL, check=True)
+        for i in range(repeat):
+            result = subprocess.run(command, cwd=directory, env=env,
+                                    stderr=subprocess.PIPE,
+                                    universal_newlines=True, check=True)
+            times.append(_cumulative_time(result.stderr, module))
+    return min(times)
+
+
+def _cumulative_time(report, module):
+    """Return the cumulative import time of module, in microseconds, from the
+    -X importtime report.
+    """
+    for line in report.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise ValueError("no import time reported for %s" % module)
+
+
+if __name__ == '__main__':
+    from translate import translate_many
+
+    sources = []
+    for path in sorted(glob.glob("./test/*_function.py") +
+                       glob.glob("./test/*_method.py")):
+        with open(path) as f:
+            sources.append(f.read())
+    sources = sources * REPEAT
+
+    batch = min(timeit.repeat(lambda: translate_many(sources), number=1,
+                              repeat=5))
+
+    print("translate_many:   %.1f snippets/sec" % (len(sources) / batch))
+    print("import cli:       %d us" % import_time("cli"))
+    print("import translate: %d us (budget %d us)"
+          % (import_time("translate"), STARTUP_BUDGET))
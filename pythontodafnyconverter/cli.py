@@ -0,0 +1,122 @@
+"""Command line entry point for translating Python files into Dafny.
+
+Only the standard library's sys module is imported up front; the translator,
+and the ast module it depends on, are imported once there is a file to
+translate, so that one-shot runs (e.g. on save in an editor) start quickly.
+"""
+
+import sys
+
+USAGE = """usage: python -m pythontodafnyconverter.cli [--max-unit-size N] FILE...
+
+Translate each Python FILE into Dafny, writing the result to FILE.dafny.
+With --max-unit-size, split methods into helpers of at most N statements
+(N must be at least 1).
+"""
+
+
+def main(argv=None):
+    """Translate the Python files named in the list of strings argv, which
+    defaults to the command line arguments, into Dafny. Return the exit
+    status: 0 on success, 1 if any file could not be read, translated or
+    written, and 2 on a usage error.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    options = parse_arguments(argv)
+    if options is None:
+        sys.stderr.write(USAGE)
+        return 2
+    paths, max_unit_size, show_help = options
+    if show_help:
+        sys.stdout.write(USAGE)
+        return 0
+
+    if __package__:
+        from .translate import translate_many
+    else:
+        from translate import translate_many
+
+    status = 0
+    readable = []
+    sources = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                sources.append(f.read())
+        except OSError as e:
+            sys.stderr.write("%s: %s\n" % (path, describe_error(e)))
+            status = 1
+        else:
+            readable.append(path)
+
+    for path, (dafny, error) in zip(readable, translate_many(sources,
+                                                             max_unit_size)):
+        if error is None:
+            try:
+                with open(path + '.dafny', 'w') as f:
+                    f.write(dafny)
+            except OSError as e:
+                error = e
+        if error is not None:
+            sys.stderr.write("%s: %s\n" % (path, describe_error(error)))
+            status = 1
+    return status
+
+
+def describe_error(error):
+    """Return a one-line description of the exception error: the name of its
+    type, followed by its message if it has one.
+    """
+    message = str(error)
+    if message:
+        return "%s: %s" % (type(error).__name__, message)
+    return type(error).__name__
+
+
+def parse_arguments(argv):
+    """Return a (paths, max_unit_size, show_help) tuple parsed from the list
+    of strings argv, or None if argv is not valid.
+
+    Options may appear anywhere before a "--" argument; getopt is not used
+    because importing it costs about as much as the rest of startup.
+    """
+    paths = []
+    max_unit_size = None
+    show_help = False
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == '--':
+            paths.extend(argv[i + 1:])
+            break
+        elif arg in ('-h', '--help'):
+            show_help = True
+        elif arg == '--max-unit-size' or arg.startswith('--max-unit-size='):
+            if '=' in arg:
+                value = arg.split('=', 1)[1]
+            elif i + 1 < len(argv):
+                i += 1
+                value = argv[i]
+            else:
+                return None
+            try:
+                max_unit_size = int(value)
+            except ValueError:
+                return None
+            if max_unit_size < 1:
+                return None
+        elif arg.startswith('-'):
+            return None
+        else:
+            paths.append(arg)
+        i += 1
+
+    if not paths and not show_help:
+        return None
+    return paths, max_unit_size, show_help
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,13 @@
+def branch_method(x: int):
+    """Return twice x plus three if x is greater than one, or two otherwise.
+    var: result: int
+    """
+
+    if x > 1:
+        y: int = x + 1
+        y = y * 2
+        y = y + 1
+    else:
+        y = 2
+    result = y
+    return result
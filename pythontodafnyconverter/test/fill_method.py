@@ -0,0 +1,13 @@
+def fill_method(a: array, n: int):
+    """Set the first n elements of a to zero.
+    pre: n >= 0
+    mod: a
+    """
+
+    i: int = 0
+    while i < n:
+        """inv: 0 <= i <= n
+        dec: n - i
+        """
+        a[i] = 0
+        i = i + 1
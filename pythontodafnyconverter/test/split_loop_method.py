@@ -0,0 +1,17 @@
+def count_method(n: int):
+    """Return n plus the number of odd numbers below n.
+    pre: n >= 0
+    var: result: int
+    """
+
+    i: int = 0
+    s: int = 0
+    while i < n:
+        """inv: 0 <= i <= n
+        dec: n - i
+        """
+        t: int = i % 2
+        s = s + t
+        i = i + 1
+    result = s + n
+    return result
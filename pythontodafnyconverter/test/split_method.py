@@ -0,0 +1,10 @@
+def sum_method(x: int, y: int):
+    """Return twice the sum of x and y, plus one.
+    pre: x > 0
+    var: result: int
+    """
+
+    a: int = x + y
+    b: int = a + a
+    result = b + 1
+    return result
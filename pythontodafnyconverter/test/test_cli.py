@@ -0,0 +1,90 @@
+import sys
+import os.path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+import contextlib
+import io
+import subprocess
+import tempfile
+import benchmark
+import cli
+
+
+class TestCliStartup(unittest.TestCase):
+
+    def test_import_defers_translator(self):
+        """Test that importing the command line entry point does not import
+        the translator or the ast module.
+        """
+
+        result = subprocess.run(
+                [sys.executable, "-c",
+                 "import sys, cli; print('translate' in sys.modules, "
+                 "'ast' in sys.modules)"],
+                cwd=os.path.dirname(cli.__file__),
+                stdout=subprocess.PIPE, universal_newlines=True, check=True)
+
+        self.assertEqual(result.stdout.strip(), "False False")
+
+    @unittest.skipIf(os.environ.get('SKIP_TIMING_TESTS'),
+                     "SKIP_TIMING_TESTS is set")
+    def test_import_time_within_budget(self):
+        """Test that importing the translator, the startup cost of a one-shot
+        translation, takes less than the startup budget. Set
+        SKIP_TIMING_TESTS to skip it on a loaded machine.
+        """
+
+        self.assertLess(benchmark.import_time("translate"),
+                        benchmark.STARTUP_BUDGET)
+
+    def test_usage(self):
+        """Test that the command line entry point reports a usage error when
+        no files are given or --max-unit-size is not a positive integer.
+        """
+
+        self.assertEqual(cli.main([]), 2)
+        self.assertEqual(cli.main(['--max-unit-size', 'x', 'a.py']), 2)
+        self.assertEqual(cli.main(['a.py', '--max-unit-size', '0']), 2)
+        self.assertEqual(cli.main(['a.py', '--max-unit-size']), 2)
+
+    def test_parse_arguments(self):
+        """Test that --max-unit-size is accepted in any position."""
+
+        self.assertEqual(cli.parse_arguments(['a.py', '--max-unit-size', '3',
+                                              'b.py']),
+                         (['a.py', 'b.py'], 3, False))
+        self.assertEqual(cli.parse_arguments(['--max-unit-size=4', 'a.py']),
+                         (['a.py'], 4, False))
+
+    def test_missing_file(self):
+        """Test that a missing input file is reported with exit status 1."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'missing.py')
+
+            self.assertEqual(cli.main([path]), 1)
+
+    def test_translation_error(self):
+        """Test that a file which cannot be translated is reported with the
+        type of the error and exit status 1, even when the error has no
+        message.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'loop.py')
+            with open(path, 'w') as f:
+                f.write("def loop_method(x: int):\n"
+                        "    for i in x:\n"
+                        "        pass\n")
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                status = cli.main([path])
+
+        self.assertEqual(status, 1)
+        self.assertEqual(stderr.getvalue(), path + ": NoBodyError\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
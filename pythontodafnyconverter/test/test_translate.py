@@ -40,6 +40,124 @@ class TestTranslateIntegration(unittest.TestCase):
 
         self.assertEqual(actual, expected)
 
+    def test_translate_many(self):
+        """Test translate_many on several sources, checking that the results
+        are in order, that each matches translate, and that a source which
+        fails does not stop the others from being translated.
+        """
+
+        sources = []
+        for name in ['identity_function.py', 'add_function.py']:
+            with open('./test/' + name) as f:
+                sources.append(f.read())
+        sources.insert(1, 'def broken(:\n')
+
+        actual = translate.translate_many(sources)
+
+        self.assertEqual(len(actual), 3)
+        self.assertIsNone(actual[1][0])
+        self.assertIsInstance(actual[1][1], SyntaxError)
+        for source, (dafny, error) in zip(sources, actual):
+            try:
+                expected = translate.translate(source)
+            except Exception as e:
+                self.assertIsNone(dafny)
+                self.assertIsInstance(error, type(e))
+            else:
+                self.assertEqual(dafny, expected)
+                self.assertIsNone(error)
+
+    def test_translate_split_method(self):
+        """Test translate on a method whose body is larger than max_unit_size,
+        checking that the leading statements are moved into a helper method
+        specified by its effect.
+        """
+
+        with open('./test/split_method.py') as f:
+            source = f.read()
+
+        actual = translate.translate(source, max_unit_size=2)
+
+        with open('./test/split_method.py.dafny') as f:
+            expected = f.read()
+
+        self.assertEqual(actual, expected)
+
+    def test_translate_split_loop_method(self):
+        """Test translate on a method containing a while loop larger than
+        max_unit_size, checking that the loop is moved into a helper method
+        specified by its invariant and that its body is split in turn.
+        """
+
+        with open('./test/split_loop_method.py') as f:
+            source = f.read()
+
+        actual = translate.translate(source, max_unit_size=2)
+
+        with open('./test/split_loop_method.py.dafny') as f:
+            expected = f.read()
+
+        self.assertEqual(actual, expected)
+
+    def test_translate_branch_assignment(self):
+        """Test translate on a method assigning a variable in both branches of
+        an if statement and reading it afterwards, with and without splitting,
+        checking that the variable is declared before the if statement.
+        """
+
+        with open('./test/branch_method.py') as f:
+            source = f.read()
+
+        actual = translate.translate(source)
+
+        self.assertIn("{\n  var y: int;\n  if x > 1 {\n    y := x + 1;\n",
+                      actual)
+
+        actual = translate.translate(source, max_unit_size=2)
+
+        with open('./test/branch_method.py.dafny') as f:
+            expected = f.read()
+
+        self.assertEqual(actual, expected)
+
+    def test_translate_split_specification_size(self):
+        """Test that the specification of a helper method grows linearly with
+        the number of assignments in it, on a chain of assignments each of
+        which reads the previous value twice.
+        """
+
+        lines = ["def chain_method(v0: int):",
+                 "    \"\"\"var: result: int\"\"\""]
+        for i in range(1, 13):
+            lines.append("    v%d: int = v%d + v%d" % (i, i - 1, i - 1))
+        lines += ["    result = v12", "    return result", ""]
+
+        actual = translate.translate("\n".join(lines), max_unit_size=12)
+
+        self.assertIn("var v12_12 := v11_11 + v11_11; v12_12);\n", actual)
+        self.assertLess(len(actual), 1000)
+
+    def test_translate_split_array_write(self):
+        """Test translate on a method whose loop writes to an array, checking
+        that the loop stays in the method, whose modifies clause covers it,
+        rather than being moved into a helper.
+        """
+
+        with open('./test/fill_method.py') as f:
+            source = f.read()
+
+        actual = translate.translate(source, max_unit_size=1)
+
+        with open('./test/fill_method.py.dafny') as f:
+            expected = f.read()
+
+        self.assertEqual(actual, expected)
+
+    def test_translate_split_invalid_size(self):
+        """Test that translate rejects a max_unit_size below one."""
+
+        with self.assertRaises(ValueError):
+            translate.translate("", max_unit_size=0)
 
 if __name__ == '__main__':
     unittest.main()
@@ -11,7 +11,12 @@
 import ast
 
 # Restrict import
-__all__ = ['translate']
+__all__ = ['translate', 'translate_many']
+
+
+# Visitor methods already looked up, shared by every translator in this run
+# (keys: (translator class, node class); values: unbound visitor functions).
+_DISPATCH = {}
 
 
 # Constants representing Dafny operator syntax.
@@ -112,28 +117,78 @@ class ExtraCommentError(Error):
 
     pass
 
-def translate(source):
+class UnitSizeError(Error):
+    """Exception raised when a statement larger than the maximum unit size
+    can't be split.
+    """
+
+    pass
+
+def translate(source, max_unit_size=None):
     """Return a string containing the Dafny translation of the Python source
     code in string source.
+
+    If max_unit_size is given, method bodies and while loops with more than
+    that many statements are split into helper methods.
     """
     assert isinstance(source, str)
     # Create the abstract syntax tree from the source code.
     tree = ast.parse(source)
 
-    dafny_translator = DafnyTranslator()
+    dafny_translator = DafnyTranslator(max_unit_size)
     return dafny_translator.initiate_translation(tree)
 
 
+def translate_many(sources, max_unit_size=None):
+    """Return a list containing a (translation, error) pair for each string of
+    Python source code in the iterable sources, in the same order.
+
+    Each source is translated by translate, with a fresh DafnyTranslator. If a
+    source cannot be parsed or translated, its translation is None and error
+    holds the exception raised; otherwise, error is None. A failed translation
+    does not stop the remaining sources from being translated. max_unit_size
+    is as for translate.
+    """
+    results = []
+    for source in sources:
+        try:
+            results.append((translate(source, max_unit_size), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
 class DafnyTranslator(ast.NodeVisitor):
     """Translate Python code into Dafny code."""
 
-    def __init__(self):
+    def __init__(self, max_unit_size=None):
         self.src = None  # Final Dafny source code.
         self.body = []  # Accumulator for translated material.
         self.indent = 0  # Indentation scope level.
         self.if_scope = 0  # Level of embedding in an if statement.
+        self.max_unit_size = max_unit_size  # Statements per method, or None.
+        self.declared = set()  # Local variables declared so far.
+        self.renames = {}  # Names to render differently (keys: name; values: name).
+
+        if max_unit_size is not None and max_unit_size < 1:
+            raise ValueError("max_unit_size must be at least 1")
 
-    def append(item):
+    def visit(self, node):
+        """Visit node using the visitor method for its class, looking the
+        method up only the first time that class is seen.
+
+        This method overrides the visit method of ast.NodeVisitor.
+        """
+        key = (self.__class__, node.__class__)
+        try:
+            visitor = _DISPATCH[key]
+        except KeyError:
+            visitor = getattr(self.__class__, 'visit_' + node.__class__.__name__,
+                              self.__class__.generic_visit)
+            _DISPATCH[key] = visitor
+        return visitor(self, node)
+
+    def append(self, item):
         """Add item to this DafnyTranslator."""
         assert isinstance(item, str)
         self.body.append(item)
@@ -147,10 +202,7 @@ class DafnyTranslator(ast.NodeVisitor):
         abstract syntax tree beginning in node to this DafnyTranslator's
         source attribute. Return this DafnyTranslator's source attribute.
         """
-        print(ast.dump(node))
         s = self.visit(node)
-        print(self.body)
-        print(self.src) #TODO
         assert isinstance(s, str)
         self.append(s)
         return self.get_source_code()
@@ -161,6 +213,27 @@ class DafnyTranslator(ast.NodeVisitor):
 
         return "%s%s" % (" " * self.indent, line)
 
+    def visit_Module(self, module):
+        """Return the Dafny translation of each definition in module,
+        separated by blank lines.
+        """
+        L = []
+        for stmt in module.body:
+            s = self.visit(stmt)
+            if s:
+                L.append(s)
+        if L:
+            return "\n\n".join(L) + "\n"
+        return ""
+
+    def _is_declared(self, name):
+        """Return whether the variable name has been declared."""
+        return name in self.declared
+
+    def _declare(self, name):
+        """Record that the variable name has been declared."""
+        self.declared.add(name)
+
     def _render_block(self, body):
         """Render a block of code with the correct indentation.
         """
@@ -183,7 +256,7 @@ class DafnyTranslator(ast.NodeVisitor):
             translator = FunctionTranslator(self.indent)
             return translator.initiate_translation(defn)
         elif "method" in defn.name:
-            translator = MethodTranslator(self.indent)
+            translator = MethodTranslator(self.indent, self.max_unit_size)
             return translator.initiate_translation(defn)
         else:
 #            raise NoTypeSpecifiedError  #TODO: create exception
@@ -218,10 +291,17 @@ class DafnyTranslator(ast.NodeVisitor):
         on its body.
         """
 
-        s = self._indent("if ")
-        s += self.visit(if_.test)
-        s += "{\n"
-        s += if_.body
+        return self._render_if(if_, self._render_block)
+
+    def _render_if(self, if_, render):
+        """Return the Dafny translation of if_, rendering each of its branches
+        with the function render.
+        """
+        s = self._indent("if " + self.visit(if_.test) + " {\n")
+        s += render(if_.body)
+        if if_.orelse:
+            s += self._indent("} else {\n")
+            s += render(if_.orelse)
         s += self._indent("}\n")
         return s
 
@@ -235,48 +315,89 @@ class DafnyTranslator(ast.NodeVisitor):
         function on its children.
         """
         s = self.visit(compare.left)
-        s += " "
-        s += compare.ops[0]
-        s += " "
-        s += compare.comparators[0]
+        for op, comparator in zip(compare.ops, compare.comparators):
+            s += " " + CMPOP_SYMBOLS[op.__class__.__name__] + " "
+            s += self.visit(comparator)
         return s
 
     def visit_Assign(self, assign):
-        """Append the Dafny translation of assign to this
-        FunctionTranslator's body attribute.
+        """Return the Dafny translation of assign, declaring its target if
+        this is the first assignment to it.
         """
-        s = self.visit(assign.value)
-        s += " := "
-        s += self.visit(assign.targets)  #TODO: check that produces correct output
-        return s
+        return self._assignment(assign.targets[0], None, assign.value)
+
+    def visit_AnnAssign(self, ann_assign):
+        """Return the Dafny declaration of the variable annotated in
+        ann_assign, with its type and, if given, its initial value.
+        """
+        type_ = self.visit(ann_assign.annotation)
+        if ann_assign.value is None:
+            if self._is_declared(ann_assign.target.id):
+                return ""
+            self._declare(ann_assign.target.id)
+            return self._indent("var %s: %s;\n" % (ann_assign.target.id, type_))
+        return self._assignment(ann_assign.target, type_, ann_assign.value)
+
+    def visit_AugAssign(self, aug_assign):
+        """Return the Dafny translation of aug_assign as a plain assignment."""
+        value = ast.BinOp(left=ast.Name(id=aug_assign.target.id, ctx=ast.Load()),
+                          op=aug_assign.op, right=aug_assign.value)
+        return self._assignment(aug_assign.target, None, value)
+
+    def _assignment(self, target, type_, value):
+        """Return the Dafny assignment of value to target, declaring target,
+        with type type_ if given, if it has not been declared yet.
+        """
+        value = self.visit(value)
+        name = self.visit(target)
+        if isinstance(target, ast.Name) and not self._is_declared(target.id):
+            self._declare(target.id)
+            if type_ is not None:
+                name += ": " + type_
+            name = "var " + name
+        return self._indent(name + " := " + value + ";\n")
+
+    def visit_Name(self, name):
+        return self.renames.get(name.id, name.id)
+
+    def visit_Subscript(self, subscript):
+        return self.visit(subscript.value) + "[" + self.visit(subscript.slice) + "]"
+
+    def visit_Constant(self, constant):
+        if isinstance(constant.value, bool):
+            return str(constant.value).lower()
+        return str(constant.value)
 
     def visit_BinOp(self, bin_op):
-        s = self.visit(bin_op.left)
-        s += OPERATOR_SYMBOLS[bin_op.op]
-        s += self.visit(bin_op.right)  #TODO: check that produces correct output
+        s = self._operand(bin_op.left)
+        s += " " + OPERATOR_SYMBOLS[bin_op.op.__class__.__name__] + " "
+        s += self._operand(bin_op.right)
         return s
 
+    def _operand(self, node):
+        """Return the Dafny translation of node, parenthesised if it is itself
+        a binary operation.
+        """
+        if isinstance(node, ast.BinOp):
+            return "(" + self.visit(node) + ")"
+        return self.visit(node)
+
     def visit_UnaryOp(self, unary_op):
-        s = UNARYOP_SYMBOLS[unary_op.op]
-        s += self.visit(unary_op.operand)  #TODO: check that produces correct output
+        s = UNARYOP_SYMBOLS[unary_op.op.__class__.__name__]
+        s += self._operand(unary_op.operand)
         return s
 
-    def visit_If(self, if_):
-        if self.if_scope > 0
-        s = "if "
-        s +=
-
     def visit_BoolOp(self, bool_op):
-        s = BOOLOP_SYMBOLS[bool_op.op]
-        s += self.visit(bool_op.values)
-        return s
+        symbol = BOOLOP_SYMBOLS[bool_op.op.__class__.__name__]
+        return (" " + symbol + " ").join(
+                "(" + self.visit(value) + ")" for value in bool_op.values)
 
 class MethodTranslator(DafnyTranslator):
     """Translate a Python function into Dafny code."""
 
     # Override the initialisation method.
-    def __init__(self, indent):
-        super().__init__()
+    def __init__(self, indent, max_unit_size=None):
+        super().__init__(max_unit_size)
 
         self.indent = indent  # Same scope as parent's current level.
 
@@ -292,6 +413,9 @@ class MethodTranslator(DafnyTranslator):
 
         self.docstring = None  # The docstring of the function.
         self.function_body = None  # The body of the function.
+        self.helpers = []  # Helper methods split out of the body.
+        self.types = None  # Variable types dict (keys: name; values: type).
+        self.helper_scope = None  # Variables declared in the current helper.
 
     def initiate_translation(self, defn):
         """Translate the Python source code contained in the tree rooted in
@@ -304,83 +428,451 @@ class MethodTranslator(DafnyTranslator):
         self.set_function_name(defn)
         self.set_arguments(defn)
 
+        # The specifications of the function come first.
+        body = defn.body
+        while body and self._is_docstring(body[0]):
+            self.visit(body[0])
+            body = body[1:]
+        self.types = self._local_types(body)
+
         # Proceed with the body of the function.
-        self.body = self._render_block(defn.body)
+        self.body = self._render_declarations(body)
+        if self.max_unit_size is None:
+            self.body += self._render_block(body)
+        else:
+            self.body += self._render_split_block(body)
 
-        return self.compile_body()
+        return "\n\n".join(self.helpers + [self.compile_body()])
 
-    def compile_body(self):
-        if isinstance(self, MethodTranslator):
-            s = "method  "
-        elif isinstance(self, FunctionTranslator):
-            s = "function  "
-        else:
-            print("Wrong class reached function def translation.") #TODO
+    def _render_declarations(self, body):
+        """Return the declarations, indented for the block body, of the
+        variables assigned within its compound statements that have not been
+        declared yet, so that they are in scope for the whole block.
 
-        try:
-            s += self.func_name
-        except TypeError:
-#            raise NoFunctionNameError
-            pass
+        A variable whose type is unknown is declared without one, leaving
+        Dafny to infer it.
+        """
+        names = set()
+        for stmt in body:
+            if isinstance(stmt, (ast.If, ast.While, ast.For, ast.With, ast.Try)):
+                names |= self._names([stmt], ast.Store)
+        s = ""
+        self.indent += 2
+        for name in sorted(names):
+            if not self._is_declared(name):
+                self._declare(name)
+                if name in self.types:
+                    s += self._indent("var %s: %s;\n" % (name, self.types[name]))
+                else:
+                    s += self._indent("var %s;\n" % name)
+        self.indent -= 2
+        return s
 
-        try:
-            s += "(" + self.get_args + ")"
-        except TypeError:
-#            raise NoArgumentsError
-            pass
+    def _render_split_block(self, body, stored=frozenset(), live=frozenset()):
+        """Render a block of code with the correct indentation, replacing runs
+        of statements larger than this MethodTranslator's max_unit_size with
+        calls to helper methods. A single while loop or if statement larger
+        than that is split in turn.
 
-        if isinstance(self, MethodTranslator):
-            try:
-                s += " returns (" + self.get_returns + ")"
-            except TypeError:
-                pass  # Append nothing if there was no return value.
-            s += "\n"
-        elif isinstance(self, FunctionTranslator):
-            try:
-                s += ": " + self.get_returns
-            except TypeError:
-                pass  # Append nothing if there was no return value.
-            s += "\n"
+        stored is the set of variables assigned before body, and live the set
+        of variables read after it. A unit whose effect cannot be specified
+        (e.g. it returns, or assigns a variable of unknown type) is rendered
+        in place instead.
+        """
+        s = ""
+        units = self._split_units(body)
+        for first, last in units:
+            unit = body[first:last]
+            before = stored | self._names(body[:first], ast.Store)
+            after = live | self._exposed_names(body[last:])
+            call = None
+            if (len(units) > 1 or
+                    self._statement_count(unit) > self.max_unit_size):
+                call = self._extract_helper(unit, before, after)
+            if call is None:
+                call = self._render_unit(unit, before, after)
+            s += call
+        return s
+
+    def _split_units(self, body):
+        """Return a list of (first, last) index pairs partitioning the
+        statements in body into units of at most max_unit_size statements.
+        A larger compound statement forms a unit on its own.
+        """
+        units = []
+        start = 0
+        size = 0
+        for i, stmt in enumerate(body):
+            n = self._statement_count([stmt])
+            if n > self.max_unit_size:
+                if start < i:
+                    units.append((start, i))
+                units.append((i, i + 1))
+                start, size = i + 1, 0
+            elif size + n > self.max_unit_size and start < i:
+                units.append((start, i))
+                start, size = i, n
+            else:
+                size += n
+        if start < len(body):
+            units.append((start, len(body)))
+        return units
+
+    def _render_unit(self, unit, stored, live):
+        """Render the statements in unit with the correct indentation. A while
+        loop or if statement larger than max_unit_size has its body split;
+        any other statement that large raises UnitSizeError.
+
+        stored and live are as for _render_split_block.
+        """
+        if self._statement_count(unit) <= self.max_unit_size:
+            return self._render_block(unit)
+
+        stmt, = unit
+        if isinstance(stmt, ast.While):
+            render = lambda: self._render_while(stmt, stored, live)
+        elif isinstance(stmt, ast.If):
+            render = lambda: self._render_if(
+                    stmt, lambda block: self._render_split_block(block, stored,
+                                                                 live))
         else:
-            print("Wrong class reached function def translation.") #TODO
+            raise UnitSizeError
+        self.indent += 2
+        s = render()
+        self.indent -= 2
+        return s
 
-        try:
-            s += self.pre
-        except TypeError:
-#            raise NoPreconditionsError
-            pass
+    def visit_While(self, while_):
+        """Return the Dafny translation of the tree beginning at while_.
+
+        This method overrides the visit_While method of the parent class
+        DafnyTranslator, so that loops in a method are translated with the
+        method's state.
+        """
+        return self._render_while(while_)
+
+    def _render_while(self, while_, stored=frozenset(), live=frozenset()):
+        """Return the Dafny translation of while_, with the specification
+        given in its docstring. If max_unit_size is set and the body is larger
+        than that, the body is split with _render_split_block.
+
+        stored and live are as for _render_split_block.
+        """
+        loop_translator = self._loop_translator(while_)
+        body = while_.body
+        if body and self._is_docstring(body[0]):
+            body = body[1:]
+
+        s = self._indent("while " + self.visit(while_.test) + "\n")
+        for keyword, spec in (("invariant", loop_translator.invariant),
+                              ("modifies", loop_translator.frame),
+                              ("decreases", loop_translator.rank)):
+            if spec is not None:
+                s += self._indent("  %s %s\n" % (keyword, spec))
+        s += self._indent("{\n")
+        if (self.max_unit_size is None or
+                self._statement_count(body) <= self.max_unit_size):
+            s += self._render_block(body)
         else:
-            s += ";\n"
+            # Variables assigned in one iteration are read in the next.
+            stored = stored | self._names(body, ast.Store)
+            live = (live | self._names([ast.Expr(value=while_.test)], ast.Load) |
+                    self._exposed_names(body) |
+                    self._spec_names(loop_translator.invariant))
+            s += self._render_split_block(body, stored, live)
+        s += self._indent("}\n")
+        return s
 
-        try:
-            s += self.post
-        except TypeError:
-#            raise NoPostconditionsError
-            pass
+    def _loop_translator(self, while_):
+        """Return a LoopTranslator holding the specification given in the
+        docstring of while_, if any.
+        """
+        loop_translator = LoopTranslator(self.indent)
+        if while_.body and self._is_docstring(while_.body[0]):
+            loop_translator.visit_Expr(while_.body[0])
+        return loop_translator
+
+    def _is_declared(self, name):
+        """Return whether the variable name has been declared, either in the
+        helper method being rendered or, outside one, in this method.
+
+        This method overrides the _is_declared method of the parent class
+        DafnyTranslator.
+        """
+        if self.helper_scope is not None:
+            return name in self.helper_scope
+        return name in self.declared or name in self.args or name in self.returns
+
+    def _declare(self, name):
+        """Record that the variable name has been declared in the helper
+        method being rendered or, outside one, in this method.
+
+        This method overrides the _declare method of the parent class
+        DafnyTranslator.
+        """
+        if self.helper_scope is not None:
+            self.helper_scope.add(name)
         else:
-            s += ";\n"
+            self.declared.add(name)
 
-        try:
-            s += self.frame
-        except TypeError:
-#            raise NoFrameSetError
-            pass
+    def _extract_helper(self, unit, stored, live):
+        """Append a helper method performing the statements in unit to this
+        MethodTranslator's helpers attribute and return the indented Dafny
+        call that replaces them. Return None if the helper's parameters,
+        return values, or specification cannot be determined.
+
+        stored and live are as for _render_split_block.
+        """
+        if any(isinstance(node, ast.Return) for node in self._walk(unit)):
+            return None
+        # A write through an array or object would need a modifies clause
+        # naming what the unit changes, so such units stay in place.
+        if any(isinstance(node, (ast.Subscript, ast.Attribute)) and
+               isinstance(node.ctx, ast.Store) for node in self._walk(unit)):
+            return None
+
+        defined = set(self.args) | stored
+        # Arguments named in the precondition, which the helper also requires
+        # unless they have been reassigned, when it may no longer hold.
+        pre_args = self._spec_names(self.pre) & set(self.args)
+        carry_pre = self.pre is not None and not pre_args & stored
+        params = self._exposed_names(unit) & defined
+        if carry_pre:
+            params |= pre_args
+        params = sorted(params)
+        returns = sorted(self._names(unit, ast.Store) &
+                         (live | set(self.returns) | set(params)))
+        if not all(name in self.types for name in params + returns):
+            return None
+        # Parameters are immutable in Dafny, so those the unit assigns are
+        # passed in under another name and copied into a return value.
+        inout = [name for name in params if name in returns]
+
+        if len(unit) == 1 and isinstance(unit[0], ast.While):
+            spec = self._loop_specification(unit[0], inout)
         else:
-            s += ";\n"
+            spec = self._straight_line_specification(unit, returns, inout)
+        if spec is None:
+            return None
+        requires, ensures = spec
+
+        # Render the body first: it may add helpers of its own.
+        indent, helper_scope = self.indent, self.helper_scope
+        self.indent = 0  # Helpers are declared at the top level.
+        self.helper_scope = set(params) | set(returns)
+        body = self._render_declarations(unit)
+        for param in inout:
+            body += "  %s := %s_in;\n" % (param, param)
+        body += self._render_unit(unit, stored, live)
+        self.indent, self.helper_scope = indent, helper_scope
+
+        name = "%sPart%d" % (self.func_name, len(self.helpers) + 1)
+        L = []
+        for param in params:
+            suffix = "_in" if param in inout else ""
+            L.append(param + suffix + ": " + self.types[param])
+        s = "method " + name + "(" + ", ".join(L) + ")"
+        if returns:
+            L = [value + ": " + self.types[value] for value in returns]
+            s += " returns (" + ", ".join(L) + ")"
+        s += "\n"
+        if carry_pre:
+            s += self._rename_inputs(self.pre, inout)
+        for line in requires:
+            s += "  requires " + line + ";\n"
+        for line in ensures:
+            s += "  ensures " + line + ";\n"
+        s += "{\n" + body + "}"
+        self.helpers.append(s)
 
-        # Append the rank set.
-        try:
-            s += self.rank
-        except TypeError:
-#            raise NoRankSetError
-            pass
+        self.indent += 2
+        call = ""
+        for value in returns:
+            if not self._is_declared(value):
+                self._declare(value)
+                call += self._indent("var %s: %s;\n" % (value, self.types[value]))
+        s = name + "(" + ", ".join(params) + ");\n"
+        if returns:
+            s = ", ".join(returns) + " := " + s
+        call += self._indent(s)
+        self.indent -= 2
+        return call
+
+    def _loop_specification(self, while_, inout):
+        """Return a (requires, ensures) pair of lists of Dafny expressions
+        specifying a helper method that runs the loop while_, or None if the
+        loop has no invariant.
+
+        The helper requires the invariant on entry, with the variables in
+        inout renamed to their input parameters, and ensures the invariant
+        and the negated loop condition on exit.
+        """
+        invariant = self._loop_translator(while_).invariant
+        if invariant is None:
+            return None
+
+        entry = self._rename_inputs(invariant, inout)
+        exit = "!(" + self.visit(while_.test) + ")"
+        return [entry], [invariant, exit]
+
+    def _straight_line_specification(self, unit, returns, inout):
+        """Return a (requires, ensures) pair of lists of Dafny expressions
+        specifying a helper method that performs the assignments in unit, or
+        None if unit contains anything other than assignments to names.
+
+        The helper ensures that each name in returns equals the value last
+        assigned to it. Each assignment is bound once in a let expression, so
+        the specification grows linearly with the number of assignments.
+        """
+        renames = {name: name + "_in" for name in inout}
+        lets = []  # Let binding of each assignment so far.
+        last = {}  # Number of bindings up to the last one for each name.
+        for stmt in unit:
+            if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and
+                    isinstance(stmt.targets[0], ast.Name)):
+                target, value = stmt.targets[0].id, stmt.value
+            elif (isinstance(stmt, ast.AnnAssign) and stmt.value is not None and
+                    isinstance(stmt.target, ast.Name)):
+                target, value = stmt.target.id, stmt.value
+            elif (isinstance(stmt, ast.AugAssign) and
+                    isinstance(stmt.target, ast.Name)):
+                target = stmt.target.id
+                value = ast.BinOp(left=ast.Name(id=target, ctx=ast.Load()),
+                                  op=stmt.op, right=stmt.value)
+            else:
+                return None
+            saved, self.renames = self.renames, renames
+            value = self.visit(value)
+            self.renames = saved
+            binding = "%s_%d" % (target, len(lets) + 1)
+            lets.append((binding, value))
+            renames = dict(renames)
+            renames[target] = binding
+            last[target] = len(lets)
+
+        ensures = []
+        for name in returns:
+            n = last[name]
+            if n == 1:
+                ensures.append(name + " == " + lets[0][1])
+            else:
+                L = ["var %s := %s; " % let for let in lets[:n]]
+                ensures.append(name + " == (" + "".join(L) + lets[n - 1][0] + ")")
+        return [], ensures
+
+    def _rename_inputs(self, text, inout):
+        """Return text with each variable in inout renamed to its input
+        parameter.
+        """
+        tokens = self._tokens(text)
+        for i in range(1, len(tokens), 2):
+            if tokens[i] in inout:
+                tokens[i] += "_in"
+        return "".join(tokens)
+
+    def _spec_names(self, text):
+        """Return the set of words in the specification text, which may be
+        None.
+        """
+        return set(self._tokens(text)[1::2])
+
+    def _tokens(self, text):
+        """Return the specification text, which may be None, split into a
+        list whose odd-indexed items are its words and whose even-indexed
+        items are the text between them.
+        """
+        # Only needed to split methods, so kept out of one-shot startup.
+        import re
+
+        return re.split(r"(\w+)", text or "")
+
+    def _local_types(self, body):
+        """Return a dict mapping the arguments, return values, and annotated
+        local variables of this function to their Dafny types.
+        """
+        types = dict(self.args)
+        types.update(self.returns)
+        for node in self._walk(body):
+            if (isinstance(node, ast.AnnAssign) and
+                    isinstance(node.target, ast.Name) and
+                    isinstance(node.annotation, ast.Name)):
+                types[node.target.id] = node.annotation.id
+        return types
+
+    def _is_docstring(self, stmt):
+        """Return whether stmt is a string literal, i.e. a specification."""
+        return (isinstance(stmt, ast.Expr) and
+                isinstance(stmt.value, ast.Constant) and
+                isinstance(stmt.value.value, str))
+
+    def _statement_count(self, stmts):
+        """Return the number of statements in stmts, including nested ones but
+        not specifications.
+        """
+        return sum(isinstance(node, ast.stmt) and not self._is_docstring(node)
+                   for node in self._walk(stmts))
+
+    def _names(self, stmts, ctx):
+        """Return the set of variable names used in stmts in context ctx,
+        which is ast.Load or ast.Store. The target of an augmented assignment
+        is both read and assigned.
+        """
+        names = set()
+        for node in self._walk(stmts):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ctx):
+                names.add(node.id)
+            elif (ctx is ast.Load and isinstance(node, ast.AugAssign) and
+                    isinstance(node.target, ast.Name)):
+                names.add(node.target.id)
+        return names
+
+    def _exposed_names(self, stmts):
+        """Return the set of variable names read in stmts before any
+        statement in stmts assigns them.
+        """
+        exposed = set()
+        assigned = set()
+        for stmt in stmts:
+            exposed |= self._names([stmt], ast.Load) - assigned
+            assigned |= self._names([stmt], ast.Store)
+        return exposed
+
+    def _walk(self, stmts):
+        """Yield every node in the trees rooted in the statements stmts."""
+        for stmt in stmts:
+            yield from ast.walk(stmt)
+
+    def compile_body(self):
+        """Return the Dafny definition of this function: its signature,
+        specification, docstring and the body rendered so far.
+        """
+        if isinstance(self, FunctionTranslator):
+            s = "function "
         else:
-            s += ";\n"
+            s = "method "
+
+        s += self.func_name
+        s += "(" + (self.get_args() or "") + ")"
 
-        # Visit the body of the function.
+        if isinstance(self, FunctionTranslator):
+            if self.returns is not None:
+                s += ": " + self.returns
+        elif self.get_returns() is not None:
+            s += " returns (" + self.get_returns() + ")"
+        s += "\n"
+
+        # The specification lines are already indented and terminated.
+        for spec in (self.pre, self.post, self.frame, self.rank):
+            if spec is not None:
+                s += spec
+
+        if self.docstring is not None:
+            s += self.docstring + "\n"
+
+        # Append the body of the function.
         s += "{\n"
-        s += body
-        s += "\n}"
+        s += self.body
+        s += "}"
 
         return s
 
@@ -501,8 +993,7 @@ class MethodTranslator(DafnyTranslator):
         """
 
 
-        self.body += self._indent("result := ")
-        self.visit(ret.value)
+        return self._indent("result := " + self.visit(ret.value) + ";\n")
 
 #TODO: for multiple returns (i.e., tuples), think about using a dictionary
 
@@ -511,7 +1002,7 @@ class FunctionTranslator(MethodTranslator):
 
     # Override the initialisation method.
     def __init__(self, indent):
-        super().__init__()
+        super().__init__(indent)
 
         self.returns = None
         # A function in Dafny only has specification for return value type.